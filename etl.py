@@ -10,20 +10,21 @@ def step_extract():
     extract_raw()
     print("Extract step completed.\n")
 
-def step_transform():
+def step_transform(write_outputs: bool = True):
     """Transform raw CSVs into clean processed data"""
     print(" Starting transform step...")
     root = Path(__file__).resolve().parents[0]
     raw_dir = root / "data" / "raw"
     out_dir = root / "data" / "processed"
-    transform_raw(raw_dir, out_dir)
+    tables = transform_raw(raw_dir, out_dir, write_outputs=write_outputs)
     print("Transform step completed.\n")
+    return tables
 
-def step_load():
+def step_load(tables=None):
     """Apply schema (idempotent) and load processed data into the database"""
     root = Path(__file__).resolve().parents[0]
     processed = root / "data" / "processed"
-    load_processed(processed)
+    load_processed(processed, tables=tables)
     print("Load step completed.\n")
 
 def main():
@@ -36,13 +37,18 @@ def main():
     )
     args = parser.parse_args()
 
-    for step in args.steps:
+    tables = None
+    for i, step in enumerate(args.steps):
         if step == "extract":
             step_extract()
         elif step == "transform":
-            step_transform()
+            # When load runs in this same process, hand the frames over
+            # in-memory and skip the CSV round-trip
+            load_follows = "load" in args.steps[i + 1:]
+            tables = step_transform(write_outputs=not load_follows)
         elif step == "load":
-            step_load()
+            step_load(tables=tables)
+            tables = None
         else:
             print(f"[unknown] Step '{step}' not recognized.")
 
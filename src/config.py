@@ -1,7 +1,11 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+@lru_cache(maxsize=1)
 def load_env():
+    # Cached so .env is only stat'd and parsed once per process
     load_dotenv(override=False)
+    return True
 def get_database_url(default: str = "sqlite:///movies.db") -> str:
     load_env()
     return os.getenv("DATABASE_URL", default)
@@ -1,14 +1,25 @@
+from functools import lru_cache
 from pathlib import Path
 from sqlalchemy import create_engine
 from .config import get_database_url
 
+@lru_cache(maxsize=1)
 def get_engine():
+    # Built once per process; every caller shares the same pool
     return create_engine(get_database_url(), future=True)
 
+@lru_cache(maxsize=8)
+def _read_schema(schema_path: Path, mtime: float) -> str:
+    # Keyed on mtime so an edited schema.sql is re-read
+    return schema_path.read_text(encoding="utf-8")
+
 def apply_schema(schema_path: Path):
     engine = get_engine()
-    sql = schema_path.read_text(encoding="utf-8")
-    statements = [s.strip() for s in sql.split(";") if s.strip()]
+    sql = _read_schema(schema_path, schema_path.stat().st_mtime)
     with engine.begin() as conn:
-        for stmt in statements:
-            conn.exec_driver_sql(stmt)
+        # Run the whole script in one round-trip; this also avoids the old
+        # fragile split(';') that broke on semicolons inside strings/triggers
+        if engine.dialect.name == "sqlite":
+            conn.connection.driver_connection.executescript(sql)
+        else:
+            conn.exec_driver_sql(sql)
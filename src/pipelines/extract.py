@@ -1,36 +1,52 @@
 from __future__ import annotations
+import asyncio
+import io
 import os
-import time
+import shelve
+import shutil
 from pathlib import Path
 import zipfile
+import aiohttp
 import requests
 import pandas as pd
 from src.config import load_env
 
 MOVIELENS_URL = "https://files.grouplens.org/datasets/movielens/ml-latest-small.zip"
 
-def _download_zip(zip_path: Path):
-    """Download the MovieLens zip file if not already present."""
-    zip_path.parent.mkdir(parents=True, exist_ok=True)
+def _download_and_extract(raw_dir: Path):
+    """Download the MovieLens zip and extract it into the raw data folder.
+
+    The HTTP body is streamed into memory and unzipped directly, so the
+    archive is never written to (or re-read from) disk.
+    """
+    ml_dir = raw_dir / "ml-latest-small"
+    zip_path = raw_dir / "ml-latest-small.zip"
+
+    if ml_dir.exists():
+        print("Dataset already extracted, skipping download.")
+        return
+
+    # A zip left over from a previous run can be extracted directly
     if zip_path.exists():
-        print("Dataset ZIP already present, skipping download.")
+        print("Dataset ZIP already present, extracting.")
+        with zipfile.ZipFile(zip_path, "r") as z:
+            z.extractall(raw_dir)
+        print(f"Extracted to {raw_dir}")
         return
+
     print(f"Downloading MovieLens dataset from {MOVIELENS_URL} ...")
 
-    # Stream download and save to disk
+    # Stream download into memory and unzip without a temp file; copy in
+    # 1 MiB blocks straight off the raw socket to minimize syscalls
+    buf = io.BytesIO()
     with requests.get(MOVIELENS_URL, stream=True, timeout=60) as r:
         r.raise_for_status()
-        with open(zip_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-    print("Download complete.")
-
-def _extract_zip(zip_path: Path, out_dir: Path): 
-    """Extract the downloaded MovieLens zip file into the raw data folder."""
-    with zipfile.ZipFile(zip_path, "r") as z:
-        z.extractall(out_dir)
-    print(f"Extracted to {out_dir}")
+        r.raw.decode_content = True
+        shutil.copyfileobj(r.raw, buf, length=1024 * 1024)
+    buf.seek(0)
+    with zipfile.ZipFile(buf) as z:
+        z.extractall(raw_dir)
+    print(f"Downloaded and extracted to {raw_dir}")
 
 def _ensure_data_present(raw_dir: Path):
     """Ensure required MovieLens CSVs (movies, ratings, links) exist."""
@@ -43,27 +59,65 @@ def _ensure_data_present(raw_dir: Path):
         raise FileNotFoundError("Expected movies.csv, ratings.csv, and links.csv under data/raw/ml-latest-small/")
     return movies, ratings, links
 
-def _imdb_tt(imdb_numeric) -> str | None:
-    """Convert IMDb numeric IDs to OMDb API format (e.g. 114709 → tt0114709)."""
-    if pd.isna(imdb_numeric):
-        return None
-    try:
-        return "tt" + str(int(imdb_numeric)).zfill(7)
-    except Exception:
-        return None
-
-def _fetch_omdb_raw(imdb_id: str, api_key: str, max_retries: int = 3, backoff: float = 0.5):
+async def _fetch_omdb_async(session: aiohttp.ClientSession, imdb_id: str, api_key: str,
+                            max_retries: int = 3, backoff: float = 0.5):
     """Call the OMDb API for a given IMDb ID and return the raw JSON response."""
     params = {"i": imdb_id, "apikey": api_key}
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.get("https://www.omdbapi.com/", params=params, timeout=20)
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException:
-            time.sleep(backoff * attempt)
+            async with session.get("https://www.omdbapi.com/", params=params,
+                                   timeout=aiohttp.ClientTimeout(total=20)) as resp:
+                if resp.status == 429:
+                    # Rate limited: honour the server's Retry-After hint
+                    retry_after = resp.headers.get("Retry-After", "1")
+                    await asyncio.sleep(int(retry_after) if retry_after.isdigit() else 1)
+                    continue
+                if resp.status >= 500:
+                    # Transient server error: back off and retry
+                    await asyncio.sleep(backoff * attempt)
+                    continue
+                if resp.status >= 400:
+                    # Permanent client error (bad ID, bad key) — retrying won't help
+                    return None
+                payload = await resp.json()
+                # OMDb reports unknown IDs as HTTP 200 with Response:"False"
+                if payload.get("Response") == "False":
+                    return None
+                return payload
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            await asyncio.sleep(backoff * attempt)
     return None
 
+
+def _fetch_omdb_batch(pairs: list[tuple[int, str]], api_key: str, cache_path: Path,
+                      concurrency: int = 20):
+    """Fetch OMDb payloads for (movieId, imdb_id) pairs concurrently.
+
+    Responses are cached on disk keyed by IMDb ID, so repeat runs skip the
+    network (and the OMDb quota) entirely for IDs seen before.
+    """
+    async def _gather(imdb_ids: list[str]):
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _bounded(imdb_id: str):
+            # Cap in-flight requests so we stay polite to the OMDb API
+            async with sem:
+                return await _fetch_omdb_async(session, imdb_id, api_key)
+
+        # Reuse a pool of keep-alive connections across all requests
+        connector = aiohttp.TCPConnector(limit=32)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*[_bounded(imdb_id) for imdb_id in imdb_ids])
+
+    with shelve.open(str(cache_path)) as cache:
+        missing = [imdb_id for _, imdb_id in pairs if imdb_id not in cache]
+        if missing:
+            fetched = asyncio.run(_gather(missing))
+            for imdb_id, payload in zip(missing, fetched):
+                if payload is not None:
+                    cache[imdb_id] = payload
+        return [cache.get(imdb_id) for _, imdb_id in pairs]
+
 def run():
     """Extract MovieLens data and fetch raw OMDb metadata."""
 
@@ -72,16 +126,10 @@ def run():
     raw_dir = root / "data" / "raw"
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    # Define zip file path and extraction directory
-    zip_path = raw_dir / "ml-latest-small.zip"
     ml_dir = raw_dir / "ml-latest-small"
 
-    # Download MovieLens dataset (if missing)
-    _download_zip(zip_path)
-
-    # Extract the zip if not already extracted
-    if not ml_dir.exists():
-        _extract_zip(zip_path, raw_dir)
+    # Download + extract MovieLens dataset (if missing)
+    _download_and_extract(raw_dir)
 
     # Verify required files exist
     movies_csv, ratings_csv, links_csv = _ensure_data_present(raw_dir)
@@ -97,29 +145,29 @@ def run():
     limit = int(os.getenv("OMDB_LIMIT", "100"))
 
     # Read links.csv (maps MovieLens movieId → IMDb ID)
-    links_df = pd.read_csv(links_csv)
+    links_df = pd.read_csv(links_csv, engine="pyarrow")
 
-    rows, count = [], 0
+    # Only the first `limit` valid links are fetched, so slice before
+    # formatting rather than building IDs for the whole frame
+    candidates = links_df.dropna(subset=["imdbId", "movieId"]).head(limit)
+    imdb_tt = "tt" + candidates["imdbId"].astype("int64").astype(str).str.zfill(7)
 
-    # Iterate through IMDb IDs and fetch OMDb data
-    for _, r in links_df.iterrows():
-        imdb_id = _imdb_tt(r.get("imdbId"))
-        if not imdb_id:
-            continue
+    # (movieId, IMDb ID) pairs, capped at the limit
+    pairs = list(zip(candidates["movieId"].astype("int64"), imdb_tt))
 
-        # Fetch OMDb data
-        payload = _fetch_omdb_raw(imdb_id, api_key)
+    # Fetch all OMDb payloads concurrently instead of one request at a time
+    payloads = _fetch_omdb_batch(pairs, api_key, raw_dir / "omdb_cache")
+
+    rows = []
+    for (movie_id, _), payload in zip(pairs, payloads):
         if payload is None:
             continue
 
-        # Add MovieLens movieId to OMDb payload for linkage
-        payload["_movieId"] = int(r["movieId"]) if not pd.isna(r.get("movieId")) else None
-        rows.append(payload)
-        count += 1
-
-        # Stop once the limit is reached
-        if count >= limit:
-            break
+        # Add MovieLens movieId to OMDb payload for linkage (copy so the
+        # cached payload stays untouched)
+        row = dict(payload)
+        row["_movieId"] = movie_id
+        rows.append(row)
 
     # Save all OMDb responses to CSV (raw format, untransformed)
     if rows:
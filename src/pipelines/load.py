@@ -1,41 +1,36 @@
 from __future__ import annotations
+import io
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
 from src.db import get_engine, apply_schema
 from src.config import get_database_url
 
-FILES = [
-    "movies.csv",
-    "genres.csv",
-    "movie_genres.csv",
-    "users.csv",
-    "ratings.csv",
-    "omdb_details.csv",
+TABLES = [
+    "movies",
+    "genres",
+    "movie_genres",
+    "users",
+    "ratings",
+    "omdb_details",
 ]
 
-def _paths(base: Path):
-    return {name: base / name for name in FILES}
+# FK-safe order for clearing the target tables
+DELETE_ORDER = ("ratings", "movie_genres", "omdb_details", "users", "genres", "movies")
 
-def _validate_files(paths: dict[str, Path]):
-    missing = [p for p in paths.values() if not p.exists()]
-    if missing:
-        raise FileNotFoundError(f"Missing processed files: {', '.join(map(str, missing))}")
-
-def _read_processed(processed_dir: Path):
-    paths = _paths(processed_dir)
-    _validate_files(paths)
-
-    movies = pd.read_csv(paths["movies.csv"]).astype({"movie_id": "int64"})
-    genres = pd.read_csv(paths["genres.csv"]).astype({"genre": "string"})
-    movie_genres = pd.read_csv(paths["movie_genres.csv"]).astype({"movie_id": "int64", "genre": "string"})
-    users = pd.read_csv(paths["users.csv"]).astype({"user_id": "int64"})
-    ratings = pd.read_csv(paths["ratings.csv"]).astype({
+# Target dtypes for the CSV fallback; Parquet preserves dtypes by itself
+DTYPES = {
+    "movies": {"movie_id": "int64", "title": "string", "year": "Int64"},
+    "genres": {"genre": "string"},
+    "movie_genres": {"movie_id": "int64", "genre": "string"},
+    "users": {"user_id": "int64"},
+    "ratings": {
         "user_id": "int64",
         "movie_id": "int64",
         "rating": "float64",
         "rating_timestamp": "int64",
-    })
-    omdb = pd.read_csv(paths["omdb_details.csv"]).astype({
+    },
+    "omdb_details": {
         "movie_id": "int64",
         "imdb_id": "string",
         "director": "string",
@@ -45,11 +40,73 @@ def _read_processed(processed_dir: Path):
         "runtime_minutes": "Int64",
         "language": "string",
         "country": "string",
-    })
-    return movies, genres, movie_genres, users, ratings, omdb
+    },
+}
+
+def _validate_files(processed_dir: Path):
+    missing = [
+        name for name in TABLES
+        if not (processed_dir / f"{name}.parquet").exists()
+        and not (processed_dir / f"{name}.csv").exists()
+    ]
+    if missing:
+        raise FileNotFoundError(f"Missing processed files: {', '.join(missing)}")
+
+def _read_table(processed_dir: Path, name: str) -> pd.DataFrame:
+    # Prefer the binary Parquet output: smaller, typed, no parse pass
+    parquet_path = processed_dir / f"{name}.parquet"
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, engine="pyarrow")
+    # CSV fallback: pass the target dtypes straight to the Arrow reader
+    # so no separate .astype(...) pass is needed afterwards
+    return pd.read_csv(processed_dir / f"{name}.csv", engine="pyarrow", dtype=DTYPES[name])
+
+def _read_processed(processed_dir: Path, tables: dict[str, pd.DataFrame] | None = None):
+    # Fast path: transform ran in this process and handed us the frames,
+    # so skip the file round-trip entirely
+    if tables is not None:
+        return tuple(tables[name] for name in TABLES)
+
+    _validate_files(processed_dir)
+    return tuple(_read_table(processed_dir, name) for name in TABLES)
+
+
+def _bulk_insert(conn, table: str, df: pd.DataFrame):
+    """Insert a frame in one bulk operation instead of chunked INSERTs.
+
+    Postgres gets a single COPY FROM STDIN pipe; everything else (SQLite)
+    gets one executemany on the raw DBAPI connection inside the caller's
+    transaction.
+    """
+    if df.empty:
+        return
+    cols = ", ".join(df.columns)
+    if conn.engine.dialect.name == "postgresql":
+        buf = io.StringIO()
+        df.to_csv(buf, index=False, header=False)
+        buf.seek(0)
+        with conn.connection.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({cols}) FROM STDIN WITH CSV", buf)
+    else:
+        placeholders = ", ".join(["?"] * len(df.columns))
+        conn.connection.driver_connection.executemany(
+            f"INSERT INTO {table} ({cols}) VALUES ({placeholders})",
+            df.itertuples(index=False, name=None),
+        )
+
+
+def _insert_table(engine, table: str, df: pd.DataFrame):
+    """Insert one table on its own connection/transaction (parallel load path)."""
+    if table == "omdb_details" and df.empty:
+        return
+    with engine.begin() as conn:
+        if table in ("movie_genres", "ratings"):
+            _bulk_insert(conn, table, df)
+        else:
+            df.to_sql(table, con=conn, if_exists="append", index=False)
 
 
-def load(processed_dir: Path):
+def load(processed_dir: Path | None, tables: dict[str, pd.DataFrame] | None = None):
     print("Starting load step...")
     db_url = get_database_url() #Establish database connection
     print(f"Using DATABASE_URL={db_url}")
@@ -57,28 +114,66 @@ def load(processed_dir: Path):
     schema_path = Path(__file__).resolve().parent.parent.parent / "schema.sql" #Get schema path
     apply_schema(schema_path)
 
-    movies, genres, movie_genres, users, ratings, omdb = _read_processed(processed_dir)
+    movies, genres, movie_genres, users, ratings, omdb = _read_processed(processed_dir, tables)
     engine = get_engine()
 
-    with engine.begin() as conn:
-        conn.exec_driver_sql("PRAGMA foreign_keys = ON;")
-
-        # Clear all target tables (FK-safe order)
-        for tbl in ("ratings", "movie_genres", "omdb_details", "users", "genres", "movies"):
-            conn.exec_driver_sql(f"DELETE FROM {tbl};")
-
-        # Insert base tables first
-        movies.to_sql("movies", con=conn, if_exists="append", index=False)
-        genres.to_sql("genres", con=conn, if_exists="append", index=False)
-        users.to_sql("users", con=conn, if_exists="append", index=False)
-
-        # Bridge + fact tables
-        movie_genres.to_sql("movie_genres", con=conn, if_exists="append", index=False)
-        ratings.to_sql("ratings", con=conn, if_exists="append", index=False)
-
-        # OMDb metadata (if present)
-        if not omdb.empty:
-            omdb.to_sql("omdb_details", con=conn, if_exists="append", index=False)
+    frames = {
+        "movies": movies,
+        "genres": genres,
+        "users": users,
+        "movie_genres": movie_genres,
+        "ratings": ratings,
+        "omdb_details": omdb,
+    }
+
+    if db_url.startswith("postgres"):
+        # Clear all target tables first, as one multi-statement command
+        with engine.begin() as conn:
+            conn.exec_driver_sql("; ".join(f"DELETE FROM {tbl}" for tbl in DELETE_ORDER) + ";")
+
+        # Insert in two FK-ordered stages; tables inside a stage have no
+        # dependencies on each other, so their writes run concurrently on
+        # independent connections to hide per-statement network latency.
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for stage in (("movies", "genres", "users"),
+                          ("movie_genres", "ratings", "omdb_details")):
+                futures = [pool.submit(_insert_table, engine, t, frames[t]) for t in stage]
+                for future in futures:
+                    future.result()
+    else:
+        # SQLite allows a single writer, so keep one transaction
+        with engine.begin() as conn:
+            conn.exec_driver_sql("PRAGMA foreign_keys = ON;")
+
+            # Bulk-load tuning: WAL + relaxed syncing avoids an fsync per
+            # commit, and the big cache/mmap keep the working set in memory
+            for pragma in (
+                "journal_mode=WAL",
+                "synchronous=NORMAL",
+                "temp_store=MEMORY",
+                "cache_size=-262144",
+                "mmap_size=1073741824",
+            ):
+                conn.exec_driver_sql(f"PRAGMA {pragma};")
+
+            # Clear all target tables; one statement each, since sqlite3's
+            # executescript would implicitly commit and break the
+            # all-or-nothing refresh this transaction provides
+            for tbl in DELETE_ORDER:
+                conn.exec_driver_sql(f"DELETE FROM {tbl};")
+
+            # Insert base tables first
+            movies.to_sql("movies", con=conn, if_exists="append", index=False)
+            genres.to_sql("genres", con=conn, if_exists="append", index=False)
+            users.to_sql("users", con=conn, if_exists="append", index=False)
+
+            # Bridge + fact tables (largest frames, so bulk-inserted)
+            _bulk_insert(conn, "movie_genres", movie_genres)
+            _bulk_insert(conn, "ratings", ratings)
+
+            # OMDb metadata (if present)
+            if not omdb.empty:
+                omdb.to_sql("omdb_details", con=conn, if_exists="append", index=False)
 
 
     print(" Load complete. Rows inserted:")
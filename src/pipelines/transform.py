@@ -1,63 +1,46 @@
 from __future__ import annotations
 from pathlib import Path
-import re
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 # This file is for cleaning the data and transforming the columns into structured data 
 # bothe from movie lens dataset and the enriched data received from OMDB API
 
 
-# Infer the year from the movie title
-def _infer_year_from_title(title: str) -> int | None:
-    # if the movie name is not a string data type return none
-    if not isinstance(title, str):
-        return None
-    
-    # A RegEx searching for opening and close brackets in the movie name with 4 digits in between which is the year
-    m = re.search(r"\((\d{4})\)$", title.strip())
-    if m:
-        # if the year is found check it is within 1870 and 2100 else return None
-        try:
-            y = int(m.group(1))
-            if 1870 <= y <= 2100:
-                return y
-        except ValueError:
-            return None
-    return None
-
-# Parse the box office value
-def _parse_box_office(value):
-    # if the box office value is not a string or is NA, return None
-    if not isinstance(value, str) or value == "N/A":
-        return None
-    
-    # Conver the box office value to an a digit and then parse it as an integer
-    digits = re.sub(r"[^0-9]", "", value)
-    return int(digits) if digits else None
-
-# Parse the runtime value
-def _parse_runtime(value):
-    # if the runtime value is not a string instance or NA return None
-    if not isinstance(value, str) or value == "N/A":
-        return None
-    # Search for digits in the runtime and parse it into an integer or else return None
-    match = re.search(r"(\d+)", value)
-    return int(match.group(1)) if match else None
-
-# Parse the released value
-def _parse_released(value):
-    # if the released value is not a string or NA return NA
-    if not isinstance(value, str) or value == "N/A":
-        return None
-    # Try to convert the released value to a date value
-    try:
-        return pd.to_datetime(value).date().isoformat()
-    except Exception:
-        return None
-
-
-# Actual transform function which will transform the data 
-def transform(raw_dir: Path, out_dir: Path) -> None:
+# Write a DataFrame as CSV through Arrow's threaded C writer
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+# Infer the year from the movie titles (e.g. "Toy Story (1995)" -> 1995)
+def _infer_year_from_title(titles: pd.Series) -> pd.Series:
+    # One vectorized regex sweep for a trailing "(YYYY)" in every title
+    years = titles.astype("string").str.strip().str.extract(r"\((\d{4})\)$", expand=False)
+    years = pd.to_numeric(years, errors="coerce").astype("Int64")
+    # keep only plausible years, anything else becomes NA
+    return years.where(years.between(1870, 2100))
+
+# Parse the box office column (e.g. "$28,341,469") into whole dollars
+def _parse_box_office(series: pd.Series) -> pd.Series:
+    # Strip everything but digits in one vectorized pass, then coerce to Int64
+    cleaned = series.astype("string").str.replace(r"[^0-9]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype("Int64")
+
+# Parse the runtime column (e.g. "81 min") into minutes
+def _parse_runtime(series: pd.Series) -> pd.Series:
+    # Extract the first run of digits from each value and coerce to Int64
+    extracted = series.astype("string").str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(extracted, errors="coerce").astype("Int64")
+
+# Parse the released column into ISO dates ("N/A" and junk coerce to NaT)
+def _parse_released(series: pd.Series) -> pd.Series:
+    return pd.to_datetime(series, errors="coerce").dt.strftime("%Y-%m-%d")
+
+
+# Actual transform function which will transform the data
+def transform(raw_dir: Path, out_dir: Path, write_outputs: bool = True) -> dict[str, pd.DataFrame]:
 
     # set the output dir as data/processed
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -69,22 +52,27 @@ def transform(raw_dir: Path, out_dir: Path) -> None:
     if not movies_path.exists() or not ratings_path.exists():
         raise FileNotFoundError("Expected movies.csv and ratings.csv under data/raw/ml-latest-small/")
 
-    movies_df = pd.read_csv(movies_path)
-    ratings_df = pd.read_csv(ratings_path)
+    # Arrow's multithreaded CSV reader is much faster than the default parser
+    movies_df = pd.read_csv(movies_path, engine="pyarrow")
+    ratings_df = pd.read_csv(ratings_path, engine="pyarrow")
 
     # ---- Movies normalization ----
-    movies_df["year"] = movies_df["title"].apply(_infer_year_from_title).astype("Int64")
+    movies_df["year"] = _infer_year_from_title(movies_df["title"])
     movies_norm = movies_df[["movieId", "title", "year"]].rename(columns={"movieId": "movie_id"})
 
     # ---- Genres normalization ----
+    # Drop movies with no usable genre string before the split/explode so
+    # the exploded frame never holds rows we would filter out afterwards
+    has_genres = movies_df["genres"].notna() & ~movies_df["genres"].str.lower().eq("(no genres listed)")
     exploded = (
-        movies_df.assign(genres=movies_df["genres"].fillna(""))
+        movies_df.loc[has_genres, ["movieId", "genres"]]
         .assign(genres=lambda d: d["genres"].str.split("|"))
         .explode("genres")
     )
-    exploded["genres"] = exploded["genres"].fillna("").str.strip()
-    exploded = exploded[exploded["genres"] != ""]
-    exploded = exploded[exploded["genres"].str.lower() != "(no genres listed)"]
+    exploded["genres"] = exploded["genres"].str.strip()
+    exploded = exploded[exploded["genres"].str.len().gt(0)]
+    # The handful of distinct genres dedupe and sort faster as categories
+    exploded["genres"] = exploded["genres"].astype("category")
 
     movie_genres = (
         exploded[["movieId", "genres"]]
@@ -96,13 +84,10 @@ def transform(raw_dir: Path, out_dir: Path) -> None:
     genres = movie_genres[["genre"]].drop_duplicates().sort_values("genre").reset_index(drop=True)
 
     # ---- Users from ratings ----
-    users = (
-        ratings_df[["userId"]]
-        .drop_duplicates()
-        .rename(columns={"userId": "user_id"})
-        .sort_values("user_id")
-        .reset_index(drop=True)
-    )
+    # np.unique sort-uniques the raw array in one C pass, without
+    # materializing a full copy of the column for drop_duplicates
+    uids = np.unique(ratings_df["userId"].to_numpy())
+    users = pd.DataFrame({"user_id": uids.astype(np.int64)})
 
     # ---- Ratings cleanup ----
     ratings_clean = (
@@ -118,37 +103,54 @@ def transform(raw_dir: Path, out_dir: Path) -> None:
     # ---- OMDb normalization ----
     omdb_raw_path = raw_dir / "ml-latest-small" / "omdb_raw.csv"
     if omdb_raw_path.exists():
-        omdb_df = pd.read_csv(omdb_raw_path, low_memory=False)
+        omdb_df = pd.read_csv(omdb_raw_path, engine="pyarrow")
         if "_movieId" not in omdb_df.columns:
             print("OMDb file missing _movieId column — skipping OMDb transform.")
             omdb_clean = pd.DataFrame()
         else:
+            # Coerce movie_id once in C and drop unusable rows before any
+            # further column work, so the parsers only see rows we keep
+            movie_id = pd.to_numeric(omdb_df["_movieId"], errors="coerce").astype("Int64")
+            mask = movie_id.notna()
+            kept = omdb_df.loc[mask]
             omdb_clean = pd.DataFrame({
-                "movie_id": omdb_df["_movieId"],
-                "imdb_id": omdb_df.get("imdbID"),
-                "director": omdb_df.get("Director"),
-                "plot": omdb_df.get("Plot"),
-                "box_office": omdb_df.get("BoxOffice").apply(_parse_box_office),
-                "released_date": omdb_df.get("Released").apply(_parse_released),
-                "runtime_minutes": omdb_df.get("Runtime").apply(_parse_runtime),
-                "language": omdb_df.get("Language"),
-                "country": omdb_df.get("Country"),
-            }).dropna(subset=["movie_id"])
-            omdb_clean["movie_id"] = omdb_clean["movie_id"].astype("int64")
+                "movie_id": movie_id.loc[mask].astype("int64"),
+                "imdb_id": kept.get("imdbID"),
+                "director": kept.get("Director"),
+                "plot": kept.get("Plot"),
+                "box_office": _parse_box_office(kept["BoxOffice"]),
+                "released_date": _parse_released(kept["Released"]),
+                "runtime_minutes": _parse_runtime(kept["Runtime"]),
+                "language": kept.get("Language"),
+                "country": kept.get("Country"),
+            })
     else:
         print("No omdb_raw.csv found — skipping OMDb transformation.")
         omdb_clean = pd.DataFrame()
 
-    # ---- Write outputs ----
-    movies_norm.to_csv(out_dir / "movies.csv", index=False)
-    genres.to_csv(out_dir / "genres.csv", index=False)
-    movie_genres.to_csv(out_dir / "movie_genres.csv", index=False)
-    users.to_csv(out_dir / "users.csv", index=False)
-    ratings_clean.to_csv(out_dir / "ratings.csv", index=False)
-    if not omdb_clean.empty:
-        omdb_clean.to_csv(out_dir / "omdb_details.csv", index=False)
+    tables = {
+        "movies": movies_norm,
+        "genres": genres,
+        "movie_genres": movie_genres,
+        "users": users,
+        "ratings": ratings_clean,
+        "omdb_details": omdb_clean,
+    }
+
+    # ---- Write outputs (skipped when load consumes the frames in-process) ----
+    if write_outputs:
+        for name, df in tables.items():
+            if name == "omdb_details" and df.empty:
+                continue
+            # Parquet is what load prefers; CSVs stay around while other
+            # consumers migrate
+            df.to_parquet(out_dir / f"{name}.parquet", engine="pyarrow")
+            _write_csv(df, out_dir / f"{name}.csv")
+        print("Transformation complete. Processed files written to:", out_dir)
+    else:
+        print("Transformation complete. Frames handed to load in-memory.")
 
-    print("Transformation complete. Processed files written to:", out_dir)
+    return tables
 
 
 def run():